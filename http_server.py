@@ -7,23 +7,40 @@ allowing it to run as a streamable HTTP service that can be Dockerized.
 """
 
 import asyncio
-import json
+import functools
+import gzip
+import io
 import logging
 import os
-import hashlib
-from typing import List, Dict, Any, Optional
+import re
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, AsyncIterator
 from contextlib import asynccontextmanager
 
 import httpx
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
-from fastapi.responses import StreamingResponse, JSONResponse
+import ijson
+import orjson
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse, JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 import uvicorn
 import redis.asyncio as aioredis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
 
 # Import the MCP server functions
-from src.defi_yields_mcp import get_yield_pools, analyze_yields
+from src.defi_yields_mcp import fetch_yield_pools, analyze_yields, to_yield_pool
+
+# analyze_yields is a pure function of its filters, so memoize the prompt text
+analyze_yields_cached = functools.lru_cache(maxsize=1024)(analyze_yields)
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +49,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class MockContext:
+    """Minimal stand-in for the MCP Context that forwards to the server logger"""
+    def info(self, message: str):
+        logger.info(f"MCP Context: {message}")
+
+    def error(self, message: str):
+        logger.error(f"MCP Context: {message}")
+
+# Shared by all handlers; MockContext holds no per-request state
+_CTX = MockContext()
+
 # Request/Response Models
 class YieldPoolRequest(BaseModel):
     chain: Optional[str] = Field(None, description="Filter by blockchain (e.g., 'Ethereum', 'Solana')")
@@ -50,13 +78,19 @@ class AnalysisRequest(BaseModel):
     chain: Optional[str] = Field(None, description="Filter by blockchain")
     project: Optional[str] = Field(None, description="Filter by project name")
 
+class JsonRpcRequest(BaseModel):
+    jsonrpc: str = Field("2.0", description="JSON-RPC protocol version")
+    id: Any = Field(None, description="Request identifier echoed in the response")
+    method: str = Field(..., description="MCP method name (e.g., 'tools/call')")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Method parameters")
+
 class HealthResponse(BaseModel):
     status: str = "healthy"
     version: str = "0.1.0"
     uptime: float
 
-# Global variables
-startup_time = 0
+# Monotonic baseline for uptime, unaffected by wall-clock adjustments
+_MONO_START = time.monotonic()
 
 # Redis connection
 redis_client: Optional[aioredis.Redis] = None
@@ -66,7 +100,8 @@ async def get_redis_client():
     global redis_client
     if redis_client is None:
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        redis_client = await aioredis.from_url(redis_url, decode_responses=True)
+        # Raw bytes: the pools payload is stored gzip-compressed
+        redis_client = await aioredis.from_url(redis_url, decode_responses=False)
     return redis_client
 
 async def close_redis_client():
@@ -76,80 +111,390 @@ async def close_redis_client():
         await redis_client.close()
         redis_client = None
 
-def cache_key(chain: Optional[str] = None, project: Optional[str] = None) -> str:
-    """Generate cache key for yield pools request"""
-    key_data = f"yield_pools:{chain or 'all'}:{project or 'all'}"
-    return f"defi_yields:{hashlib.md5(key_data.encode()).hexdigest()}"
+@dataclass
+class PoolIndex:
+    """Full pool list plus chain/project indexes into it, built once per fetch"""
+    pools: List[Dict[str, Any]]
+    by_chain: Dict[str, List[int]] = field(default_factory=dict)
+    by_project: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, pools: List[Dict[str, Any]]) -> "PoolIndex":
+        by_chain = defaultdict(list)
+        by_project = defaultdict(list)
+        for idx, pool in enumerate(pools):
+            by_chain[pool["chain"].lower()].append(idx)
+            by_project[pool["project"].lower()].append(idx)
+        return cls(pools=pools, by_chain=dict(by_chain), by_project=dict(by_project))
+
+    def select(self, chain: Optional[str] = None, project: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return pools matching chain and/or project (case-insensitive)"""
+        if not chain and not project:
+            return self.pools
+
+        hits = None
+        if chain:
+            hits = self.by_chain.get(chain.lower(), [])
+        if project:
+            project_hits = self.by_project.get(project.lower(), [])
+            # Keep upstream ordering when intersecting both indexes
+            hits = project_hits if hits is None else sorted(set(hits).intersection(project_hits))
+        return [self.pools[idx] for idx in hits]
+
+# All pools are cached under a single key and filtered in process, so every
+# chain/project combination is served from one upstream fetch per TTL window.
+POOLS_CACHE_KEY = "defi_yields:pools:all"
+
+# In-flight upstream fetches by cache key; concurrent callers await the same future
+_inflight: Dict[str, "asyncio.Future[PoolIndex]"] = {}
+
+# Per-process memo of indexed pools as (expires_at, version, index). With Redis enabled the
+# memo is reused while its version matches Redis; otherwise it is served until expires_at.
+_local_cache: Dict[str, Tuple[float, Optional[str], PoolIndex]] = {}
+
+# Cap on concurrent outbound calls to yields.llama.fi, mirrored in the shared client's limits
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "8"))
+_UPSTREAM_SEM = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+
+# Bytes searched for the top-level status before and after the pools array
+_STATUS_SCAN_LIMIT = 64 * 1024
+
+# Cross-worker fetch lock: how long a holder may fetch, and how often losers poll for its result
+FETCH_LOCK_TIMEOUT = 30
+FETCH_LOCK_POLL_INTERVAL = 0.1
+# How long past its TTL a worker may serve its own memo while another worker fetches
+FETCH_LOCK_STALE_GRACE = 10
+
+# Sentinel the streaming producer puts on its queue once upstream is exhausted
+_STREAM_DONE = object()
+
+# SSE framing as bytes so frames are built by concatenating orjson output directly
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_HEARTBEAT = b": keepalive\n\n"
+_SSE_HEARTBEAT_INTERVAL = 15.0
+# On a cache miss, a partial batch is sent once it has waited this long to fill
+_STREAM_BATCH_MAX_DELAY = 0.25
+_SSE_FETCHING = _SSE_PREFIX + orjson.dumps({'status': 'fetching', 'message': 'Fetching yield pools...'}) + _SSE_SUFFIX
+
+def cache_enabled() -> bool:
+    """Whether the Redis cache tier is enabled"""
+    return os.getenv("CACHE_ENABLED", "false").lower() == "true"
+
+def cache_ttl() -> int:
+    """Seconds a fetched pool list stays cached"""
+    return int(os.getenv("CACHE_TTL", "45"))
+
+def version_key(key: str) -> str:
+    """Redis key holding the version of the payload cached under key"""
+    return f"{key}:version"
+
+async def get_cached_pools(key: str) -> Optional[PoolIndex]:
+    """Get cached yield pools, decompressing from Redis only when its version changes"""
+    entry = _local_cache.get(key)
+
+    if cache_enabled():
+        try:
+            redis = await get_redis_client()
+            version = await redis.get(version_key(key))
+            if version is None:
+                return None
+            if entry and entry[1] == version.decode():
+                return entry[2]
+
+            # Read version and payload together so they always match
+            version, cached_data = await redis.mget(version_key(key), key)
+            if version is None or cached_data is None:
+                return None
+            index = PoolIndex.build(orjson.loads(gzip.decompress(cached_data)))
+            _local_cache[key] = (time.monotonic() + cache_ttl(), version.decode(), index)
+            return index
+        except Exception as e:
+            logger.error(f"Redis cache get error: {e}")
+
+    if entry and entry[0] > time.monotonic():
+        return entry[2]
+    return None
 
-async def get_cached_pools(key: str) -> Optional[List[Dict[str, Any]]]:
-    """Get cached yield pools data"""
-    redis = await get_redis_client()
-    if not redis:
-        return None
+async def cache_pools(key: str, pools: List[Dict[str, Any]], ttl: int = 45) -> PoolIndex:
+    """Index and cache yield pools locally and, if enabled, in Redis"""
+    index = PoolIndex.build(pools)
+    version = uuid.uuid4().hex
+    _local_cache[key] = (time.monotonic() + ttl, version, index)
+
+    if cache_enabled():
+        try:
+            redis = await get_redis_client()
+            payload = gzip.compress(orjson.dumps(pools), compresslevel=5)
+            await (
+                redis.pipeline(transaction=True)
+                .set(key, payload, ex=ttl)
+                .set(version_key(key), version, ex=ttl)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Redis cache set error: {e}")
+    return index
+
+def lock_key(key: str) -> str:
+    """Redis key held by the worker currently fetching the payload for key"""
+    return f"{key}:lock"
+
+async def claim_upstream_fetch(key: str) -> Tuple[bool, Optional[Lock]]:
+    """
+    Try to become the one worker fetching key from upstream.
+
+    Returns (claimed, lock). claimed is False if another worker already holds
+    the lock; lock is the held Redis lock to pass to release_upstream_fetch.
+    Without Redis the in-process singleflight is the only guard, so the claim
+    always succeeds with no lock.
+    """
+    if not cache_enabled():
+        return True, None
 
     try:
-        cached_data = await redis.get(key)
-        if cached_data:
-            return json.loads(cached_data)
+        redis = await get_redis_client()
+        lock = redis.lock(lock_key(key), timeout=FETCH_LOCK_TIMEOUT, blocking=False)
+        if await lock.acquire():
+            return True, lock
+        return False, None
     except Exception as e:
-        logger.error(f"Redis cache get error: {e}")
-    return None
+        logger.error(f"Redis fetch lock error: {e}")
+        return True, None
 
-async def cache_pools(key: str, pools: List[Dict[str, Any]], ttl: int = 300):
-    """Cache yield pools data"""
-    redis = await get_redis_client()
-    if not redis:
+async def release_upstream_fetch(lock: Optional[Lock]):
+    """Release a fetch lock, leaving it alone if it expired and another worker took it"""
+    if lock is None:
         return
 
     try:
-        await redis.setex(key, ttl, json.dumps(pools))
+        # Lock.release is an atomic compare-and-delete on the lock's owner tag
+        await lock.release()
+    except LockError as e:
+        logger.warning(f"Redis fetch lock expired before release: {e}")
     except Exception as e:
-        logger.error(f"Redis cache set error: {e}")
+        logger.error(f"Redis fetch lock release error: {e}")
+
+async def wait_for_upstream_fetch(key: str, require_fresh: bool = False) -> Optional[PoolIndex]:
+    """
+    Get pools while another worker fetches key: serve this worker's memo if it
+    expired no more than FETCH_LOCK_STALE_GRACE ago, otherwise poll until the
+    other worker's result lands in Redis.
+
+    With require_fresh (a forced refresh) the memo is never served and only a
+    payload version written after the wait began is accepted. Returns None if
+    the lock is released or expires without a result, in which case the
+    caller should fetch itself.
+    """
+    entry = _local_cache.get(key)
+    if not require_fresh and entry and entry[0] + FETCH_LOCK_STALE_GRACE > time.monotonic():
+        return entry[2]
+
+    try:
+        redis = await get_redis_client()
+        start_version = await redis.get(version_key(key)) if require_fresh else None
+    except Exception as e:
+        logger.error(f"Redis fetch lock error: {e}")
+        return None
+
+    deadline = time.monotonic() + FETCH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(FETCH_LOCK_POLL_INTERVAL)
+        try:
+            if not require_fresh or await redis.get(version_key(key)) != start_version:
+                index = await get_cached_pools(key)
+                if index is not None:
+                    return index
+            if not await redis.exists(lock_key(key)):
+                return None
+        except Exception as e:
+            logger.error(f"Redis fetch lock error: {e}")
+            return None
+    return None
+
+def singleflight_future(key: str, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+    """Return the in-flight future for key, starting fetch() if none is running"""
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return future
+
+async def singleflight(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fetch() once per key; concurrent callers share the in-flight result"""
+    # Shield so one disconnecting caller does not cancel the fetch for everyone
+    return await asyncio.shield(singleflight_future(key, fetch))
+
+class _AsyncByteReader:
+    """Adapts an async byte iterator to the async read() interface ijson expects"""
+    def __init__(self, chunks: AsyncIterator[bytes], head: bytes = b""):
+        self._chunks = chunks
+        self._buffer = head
+        # Last bytes read, kept so a status trailing the data array can still be checked
+        self.tail = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        if not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.tail = (self.tail + data)[-_STATUS_SCAN_LIMIT:]
+        return data
+
+def _scan_status_head(head: bytes) -> Tuple[Optional[str], bool]:
+    """
+    Parse the top-level keys in head that precede "data".
+
+    Returns the status seen so far and whether the "data" key was reached.
+    Only the few events before the pool array go through Python.
+    """
+    status = None
+    try:
+        for prefix, event, value in ijson.parse(io.BytesIO(head)):
+            if prefix == "" and event == "map_key" and value == "data":
+                return status, True
+            if prefix == "status" and event == "string":
+                status = value
+    except ijson.JSONError:
+        pass
+    return status, False
+
+def _trailing_status(tail: bytes) -> Optional[str]:
+    """Find a top-level status that follows the data array at the end of the body"""
+    match = re.search(rb'"status"\s*:\s*"([^"]*)"', tail[tail.rfind(b"]") + 1:])
+    return match.group(1).decode() if match else None
+
+async def iter_yield_pools(ctx: Any, client: httpx.AsyncClient) -> AsyncIterator[Dict[str, Any]]:
+    """Stream-parse the yields.llama.fi pools payload, yielding each pool as it arrives"""
+    ctx.info("Streaming yield pools from yields.llama.fi")
+    try:
+        async with _UPSTREAM_SEM:
+            async with client.stream("GET", "https://yields.llama.fi/pools") as response:
+                response.raise_for_status()
+                chunks = response.aiter_bytes()
+
+                # Buffer the head of the body until the "data" key so a status that
+                # precedes the pools is checked before any of them are forwarded
+                head = b""
+                status = None
+                async for chunk in chunks:
+                    head += chunk
+                    status, reached_data = _scan_status_head(head)
+                    if reached_data or len(head) > _STATUS_SCAN_LIMIT:
+                        break
+                if status is not None and status != "success":
+                    raise ValueError("API returned non-success status")
+
+                # Replay the buffered head so pools are built in C by items_async
+                reader = _AsyncByteReader(chunks, head=head)
+                async for pool in ijson.items_async(reader, "data.item", use_float=True):
+                    yield to_yield_pool(pool)
+
+                if status is None:
+                    status = _trailing_status(reader.tail)
+                if status != "success":
+                    raise ValueError("API returned non-success status")
+    except Exception as e:
+        ctx.error(f"Error fetching yield pools: {str(e)}")
+        raise
+
+async def stream_pools_into_cache(
+    queue: "asyncio.Queue[Any]",
+    ctx: Any,
+    client: httpx.AsyncClient
+) -> PoolIndex:
+    """
+    Producer: push pools onto queue as they are parsed, then cache the full list.
+
+    If the pools turn out to be cached already, or another worker fetched them,
+    the PoolIndex itself is put on the queue instead of the individual pools.
+    """
+    # A fetch that finished while the caller checked the cache may already have filled it
+    index = await get_cached_pools(POOLS_CACHE_KEY)
+    lock = None
+    if index is None:
+        claimed, lock = await claim_upstream_fetch(POOLS_CACHE_KEY)
+        if not claimed:
+            # Another worker is fetching; reuse its result instead of hitting upstream
+            index = await wait_for_upstream_fetch(POOLS_CACHE_KEY)
+
+    if index is not None:
+        # Hand the indexed result to the consumer rather than replaying every pool
+        queue.put_nowait(index)
+        return index
+
+    pools = []
+    try:
+        try:
+            async for pool in iter_yield_pools(ctx, client):
+                pools.append(pool)
+                queue.put_nowait(pool)
+        finally:
+            queue.put_nowait(_STREAM_DONE)
+
+        if not pools:
+            return PoolIndex(pools=pools)
+        return await cache_pools(POOLS_CACHE_KEY, pools, cache_ttl())
+    finally:
+        await release_upstream_fetch(lock)
 
 async def get_yield_pools_cached(
     chain: Optional[str] = None,
     project: Optional[str] = None,
-    ctx: Optional[Any] = None
+    ctx: Optional[Any] = None,
+    force_refresh: bool = False,
+    client: Optional[httpx.AsyncClient] = None
 ) -> List[Dict[str, Any]]:
-    """Get yield pools with Redis caching"""
+    """Get yield pools from the shared all-pools cache, filtered in memory"""
+    async def load_pools() -> PoolIndex:
+        if not force_refresh:
+            # A fetch that finished while we checked the cache may already have filled it
+            index = await get_cached_pools(POOLS_CACHE_KEY)
+            if index is not None:
+                return index
 
-    # Check if caching is enabled
-    cache_enabled = os.getenv("CACHE_ENABLED", "false").lower() == "true"
-    cache_ttl = int(os.getenv("CACHE_TTL", "300"))
+        if ctx:
+            ctx.info(f"Cache miss for {POOLS_CACHE_KEY}")
 
-    if cache_enabled:
-        # Try cache first
-        key = cache_key(chain, project)
-        cached_result = await get_cached_pools(key)
-        if cached_result:
-            if ctx:
-                ctx.info(f"Cache hit for {key}")
-            return cached_result
+        claimed, lock = await claim_upstream_fetch(POOLS_CACHE_KEY)
+        if not claimed:
+            # Another worker is fetching; reuse its result instead of hitting upstream
+            index = await wait_for_upstream_fetch(POOLS_CACHE_KEY, require_fresh=force_refresh)
+            if index is not None:
+                return index
 
-        if ctx:
-            ctx.info(f"Cache miss for {key}")
+        try:
+            if ctx:
+                ctx.info("Fetching yield pools from yields.llama.fi")
 
-    # Cache miss or disabled - fetch from API
-    if ctx:
-        ctx.info("Fetching yield pools from yields.llama.fi")
+            async with _UPSTREAM_SEM:
+                pools = await fetch_yield_pools(ctx=ctx, client=client)
 
-    pools = await get_yield_pools(chain=chain, project=project, ctx=ctx)
+            if not pools:
+                return PoolIndex(pools=pools)
+            index = await cache_pools(POOLS_CACHE_KEY, pools, cache_ttl())
+            if ctx:
+                ctx.info(f"Cached {len(pools)} pools for {POOLS_CACHE_KEY}")
+            return index
+        finally:
+            await release_upstream_fetch(lock)
 
-    # Cache the result
-    if cache_enabled and pools:
-        key = cache_key(chain, project)
-        await cache_pools(key, pools, cache_ttl)
-        if ctx:
-            ctx.info(f"Cached {len(pools)} pools for {key}")
+    index = None if force_refresh else await get_cached_pools(POOLS_CACHE_KEY)
+    if index is None:
+        index = await singleflight(POOLS_CACHE_KEY, load_pools)
+    elif ctx:
+        ctx.info(f"Cache hit for {POOLS_CACHE_KEY}")
 
-    return pools
+    return index.select(chain, project)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
-    global startup_time
-    import time
-    startup_time = time.time()
     logger.info("DeFi Yields HTTP Server starting up...")
 
     # Initialize Redis if enabled
@@ -160,11 +505,21 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Redis connection failed, caching disabled: {e}")
 
+    # Shared upstream client so keep-alive connections are reused across requests
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=UPSTREAM_CONCURRENCY,
+            max_connections=UPSTREAM_CONCURRENCY,
+            keepalive_expiry=30
+        ),
+        timeout=httpx.Timeout(10.0, connect=5.0)
+    )
+
     # Test external API connectivity
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get("https://yields.llama.fi/pools")
-            response.raise_for_status()
+        response = await app.state.http.get("https://yields.llama.fi/pools")
+        response.raise_for_status()
         logger.info("Successfully connected to DefiLlama API")
     except Exception as e:
         logger.error(f"Failed to connect to DefiLlama API: {e}")
@@ -173,6 +528,7 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup
+    await app.state.http.aclose()
     await close_redis_client()
     logger.info("DeFi Yields HTTP Server shutting down...")
 
@@ -181,7 +537,8 @@ app = FastAPI(
     title="DeFi Yields MCP HTTP Server",
     description="HTTP API wrapper for DeFi Yields MCP server providing yield pool data from DefiLlama",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -193,12 +550,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads such as full /pools dumps. Starlette >= 0.46 skips
+# text/event-stream, so SSE frames from /pools/stream are never held in the gzip buffer.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    import time
-    uptime = time.time() - startup_time
+    uptime = time.monotonic() - _MONO_START
     return HealthResponse(
         status="healthy",
         version="0.1.0",
@@ -223,57 +583,114 @@ async def root():
         }
     }
 
+# Static MCP results, encoded once at import since they never change per request
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2025-03-26",
+    "capabilities": {
+        "tools": {},
+        "prompts": {}
+    },
+    "serverInfo": {
+        "name": "DeFi Yields MCP Server",
+        "version": "0.1.0"
+    }
+}
+
+_TOOLS_LIST = {
+    "tools": [
+        {
+            "name": "get_yield_pools",
+            "description": "Fetch DeFi yield pools from the yields.llama.fi API, optionally filtering by chain or project",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "chain": {
+                        "type": "string",
+                        "description": "Filter for blockchain (e.g., 'Ethereum', 'Solana')"
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Filter for project name (e.g., 'lido', 'aave-v3')"
+                    }
+                }
+            }
+        }
+    ]
+}
+
+_PROMPTS_LIST = {
+    "prompts": [
+        {
+            "name": "analyze_yields",
+            "description": "Generate a prompt to analyze DeFi yield pools, optionally filtered by chain or project",
+            "arguments": [
+                {
+                    "name": "chain",
+                    "description": "Optional blockchain filter",
+                    "required": False
+                },
+                {
+                    "name": "project",
+                    "description": "Optional project filter",
+                    "required": False
+                }
+            ]
+        }
+    ]
+}
+
+_INITIALIZE_RESULT_BYTES = orjson.dumps(_INITIALIZE_RESULT)
+_TOOLS_LIST_BYTES = orjson.dumps(_TOOLS_LIST)
+_PROMPTS_LIST_BYTES = orjson.dumps(_PROMPTS_LIST)
+
+def jsonrpc_cached_result(request_id: Any, result_bytes: bytes) -> Response:
+    """Build a JSON-RPC success response around a pre-encoded result"""
+    body = b'{"jsonrpc":"2.0","id":' + orjson.dumps(request_id) + b',"result":' + result_bytes + b'}'
+    return Response(content=body, media_type="application/json")
+
+@app.exception_handler(RequestValidationError)
+async def mcp_validation_error_handler(request: Request, exc: RequestValidationError):
+    """Report malformed MCP requests on / as JSON-RPC errors instead of HTTP 422"""
+    if request.url.path != "/" or request.method != "POST":
+        return await request_validation_exception_handler(request, exc)
+
+    errors = exc.errors()
+    if any(error.get("type") == "json_invalid" for error in errors):
+        code, message = -32700, "Parse error"
+    else:
+        code, message = -32600, "Invalid Request"
+
+    body = exc.body
+    return ORJSONResponse({
+        "jsonrpc": "2.0",
+        "id": body.get("id") if isinstance(body, dict) else None,
+        "error": {
+            "code": code,
+            "message": message,
+            "data": jsonable_encoder(errors)
+        }
+    })
+
 @app.post("/")
-async def mcp_endpoint(request: Dict[str, Any]):
+async def mcp_endpoint(request: JsonRpcRequest):
     """
     MCP JSON-RPC endpoint for n8n integration
     Handles MCP protocol requests for tools and prompts
     """
-    try:
-        method = request.get("method")
-        params = request.get("params", {})
-        request_id = request.get("id")
+    method = request.method
+    params = request.params
+    request_id = request.id
 
+    try:
         if method == "initialize":
             # MCP protocol initialization handshake
             client_info = params.get("clientInfo", {})
             logger.info(f"MCP initialization from {client_info.get('name', 'unknown')} v{client_info.get('version', 'unknown')}")
 
-            result = {
-                "protocolVersion": "2025-03-26",
-                "capabilities": {
-                    "tools": {},
-                    "prompts": {}
-                },
-                "serverInfo": {
-                    "name": "DeFi Yields MCP Server",
-                    "version": "0.1.0"
-                }
-            }
+            return jsonrpc_cached_result(request_id, _INITIALIZE_RESULT_BYTES)
 
         elif method == "tools/list":
-            # List available tools
-            result = {
-                "tools": [
-                    {
-                        "name": "get_yield_pools",
-                        "description": "Fetch DeFi yield pools from the yields.llama.fi API, optionally filtering by chain or project",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "chain": {
-                                    "type": "string",
-                                    "description": "Filter for blockchain (e.g., 'Ethereum', 'Solana')"
-                                },
-                                "project": {
-                                    "type": "string",
-                                    "description": "Filter for project name (e.g., 'lido', 'aave-v3')"
-                                }
-                            }
-                        }
-                    }
-                ]
-            }
+            return jsonrpc_cached_result(request_id, _TOOLS_LIST_BYTES)
 
         elif method == "tools/call":
             # Call a tool
@@ -281,24 +698,18 @@ async def mcp_endpoint(request: Dict[str, Any]):
             arguments = params.get("arguments", {})
 
             if tool_name == "get_yield_pools":
-                # Create a mock context for the MCP function
-                class MockContext:
-                    def info(self, message: str):
-                        logger.info(f"MCP Context: {message}")
-                    def error(self, message: str):
-                        logger.error(f"MCP Context: {message}")
-
                 pools = await get_yield_pools_cached(
                     chain=arguments.get("chain"),
                     project=arguments.get("project"),
-                    ctx=MockContext()
+                    ctx=_CTX,
+                    client=app.state.http
                 )
 
                 result = {
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(pools, indent=2)
+                            "text": orjson.dumps(pools, option=orjson.OPT_INDENT_2).decode()
                         }
                     ]
                 }
@@ -306,27 +717,7 @@ async def mcp_endpoint(request: Dict[str, Any]):
                 raise ValueError(f"Unknown tool: {tool_name}")
 
         elif method == "prompts/list":
-            # List available prompts
-            result = {
-                "prompts": [
-                    {
-                        "name": "analyze_yields",
-                        "description": "Generate a prompt to analyze DeFi yield pools, optionally filtered by chain or project",
-                        "arguments": [
-                            {
-                                "name": "chain",
-                                "description": "Optional blockchain filter",
-                                "required": False
-                            },
-                            {
-                                "name": "project",
-                                "description": "Optional project filter",
-                                "required": False
-                            }
-                        ]
-                    }
-                ]
-            }
+            return jsonrpc_cached_result(request_id, _PROMPTS_LIST_BYTES)
 
         elif method == "prompts/get":
             # Get a specific prompt
@@ -337,7 +728,7 @@ async def mcp_endpoint(request: Dict[str, Any]):
                 chain = arguments.get("chain")
                 project = arguments.get("project")
 
-                prompt_text = analyze_yields(chain=chain, project=project)
+                prompt_text = analyze_yields_cached(chain, project)
 
                 result = {
                     "description": prompt_text,
@@ -366,7 +757,7 @@ async def mcp_endpoint(request: Dict[str, Any]):
         logger.error(f"MCP Error ({method}): {str(e)}")
         return {
             "jsonrpc": "2.0",
-            "id": request.get("id"),
+            "id": request_id,
             "error": {
                 "code": -1,
                 "message": str(e)
@@ -374,7 +765,7 @@ async def mcp_endpoint(request: Dict[str, Any]):
         }
 
 # Yield pools endpoint
-@app.post("/pools", response_model=List[YieldPool])
+@app.post("/pools", response_class=ORJSONResponse, responses={200: {"model": List[YieldPool]}})
 async def get_pools(request: YieldPoolRequest):
     """
     Get DeFi yield pools with optional filtering
@@ -383,28 +774,22 @@ async def get_pools(request: YieldPoolRequest):
         request: YieldPoolRequest with optional chain and project filters
     """
     try:
-        # Mock Context for MCP server
-        class MockContext:
-            def info(self, message: str):
-                logger.info(f"MCP Context: {message}")
-
-            def error(self, message: str):
-                logger.error(f"MCP Context: {message}")
-
         pools = await get_yield_pools_cached(
             chain=request.chain,
             project=request.project,
-            ctx=MockContext()
+            ctx=_CTX,
+            client=app.state.http
         )
 
-        return [YieldPool(**pool) for pool in pools]
+        # Upstream pools already match the YieldPool shape, so skip per-pool validation
+        return ORJSONResponse(pools)
 
     except Exception as e:
         logger.error(f"Error fetching yield pools: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # GET version of pools endpoint for easier browser testing
-@app.get("/pools", response_model=List[YieldPool])
+@app.get("/pools", response_class=ORJSONResponse, responses={200: {"model": List[YieldPool]}})
 async def get_pools_get(
     chain: Optional[str] = Query(None, description="Filter by blockchain"),
     project: Optional[str] = Query(None, description="Filter by project name")
@@ -417,47 +802,119 @@ async def get_pools_get(
 @app.get("/pools/stream")
 async def get_pools_stream(
     chain: Optional[str] = Query(None, description="Filter by blockchain"),
-    project: Optional[str] = Query(None, description="Filter by project name")
+    project: Optional[str] = Query(None, description="Filter by project name"),
+    batch_size: int = Query(256, ge=1, le=10000, description="Pools per streamed event")
 ):
-    """Streaming endpoint for yield pools"""
+    """Streaming endpoint for yield pools, emitting one event per batch of pools"""
+
+    def batch_frames(pools: List[Dict[str, Any]]):
+        """SSE data frames for a complete result, batched to amortize per-event overhead"""
+        for offset in range(0, len(pools), batch_size):
+            chunk = {
+                'status': 'data',
+                'offset': offset,
+                'total': len(pools),
+                'pools': pools[offset:offset + batch_size]
+            }
+            yield _SSE_PREFIX + orjson.dumps(chunk) + _SSE_SUFFIX
 
     async def generate_stream():
         try:
-            class MockContext:
-                def info(self, message: str):
-                    logger.info(f"MCP Context: {message}")
-
-                def error(self, message: str):
-                    logger.error(f"MCP Context: {message}")
-
             # Send initial chunk
-            yield f"data: {json.dumps({'status': 'fetching', 'message': 'Fetching yield pools...'})}\n\n"
-
-            pools = await get_yield_pools_cached(
-                chain=chain,
-                project=project,
-                ctx=MockContext()
-            )
-
-            # Send results as stream
-            for i, pool in enumerate(pools):
-                chunk = {
-                    'status': 'data',
-                    'index': i,
-                    'total': len(pools),
-                    'pool': pool
-                }
-                yield f"data: {json.dumps(chunk)}\n\n"
+            yield _SSE_FETCHING
+
+            index = await get_cached_pools(POOLS_CACHE_KEY)
+            if index is None and POOLS_CACHE_KEY in _inflight:
+                # Another request is already fetching; wait for its full result
+                future = _inflight[POOLS_CACHE_KEY]
+                while not future.done():
+                    try:
+                        await asyncio.wait_for(asyncio.shield(future), timeout=_SSE_HEARTBEAT_INTERVAL)
+                    except asyncio.TimeoutError:
+                        yield _SSE_HEARTBEAT
+                index = future.result()
+
+            if index is not None:
+                pools = index.select(chain, project)
+                for frame in batch_frames(pools):
+                    yield frame
+                total = len(pools)
+            else:
+                # Cache miss: parse upstream in a producer task and forward pools as they
+                # arrive. The total is unknown until upstream is exhausted.
+                queue: asyncio.Queue = asyncio.Queue()
+                future = singleflight_future(
+                    POOLS_CACHE_KEY,
+                    lambda: stream_pools_into_cache(queue, _CTX, app.state.http)
+                )
+                chain_filter = chain.lower() if chain else None
+                project_filter = project.lower() if project else None
+
+                total = 0
+                batch = []
+                batch_deadline = 0.0
+                while True:
+                    if not queue.empty():
+                        pool = queue.get_nowait()
+                    else:
+                        # Wait for upstream, but no longer than the open batch may be held back
+                        timeout = (
+                            max(batch_deadline - time.monotonic(), 0.0) if batch
+                            else _SSE_HEARTBEAT_INTERVAL
+                        )
+                        try:
+                            pool = await asyncio.wait_for(queue.get(), timeout=timeout)
+                        except asyncio.TimeoutError:
+                            if batch:
+                                chunk = {'status': 'data', 'offset': total, 'total': None, 'pools': batch}
+                                yield _SSE_PREFIX + orjson.dumps(chunk) + _SSE_SUFFIX
+                                total += len(batch)
+                                batch = []
+                            else:
+                                # Upstream is slow; keep proxies from idle-closing the stream
+                                yield _SSE_HEARTBEAT
+                            continue
+                    if pool is _STREAM_DONE:
+                        break
+                    if isinstance(pool, PoolIndex):
+                        # The producer found the pools cached; serve them through the index
+                        pools = pool.select(chain, project)
+                        for frame in batch_frames(pools):
+                            yield frame
+                        total = len(pools)
+                        break
+                    if chain_filter and pool["chain"].lower() != chain_filter:
+                        continue
+                    if project_filter and pool["project"].lower() != project_filter:
+                        continue
+
+                    if not batch:
+                        batch_deadline = time.monotonic() + _STREAM_BATCH_MAX_DELAY
+                    batch.append(pool)
+                    # Flush full batches, or a partial one that has waited too long to fill
+                    if len(batch) >= batch_size or time.monotonic() >= batch_deadline:
+                        chunk = {'status': 'data', 'offset': total, 'total': None, 'pools': batch}
+                        yield _SSE_PREFIX + orjson.dumps(chunk) + _SSE_SUFFIX
+                        total += len(batch)
+                        batch = []
+
+                if batch:
+                    chunk = {'status': 'data', 'offset': total, 'total': None, 'pools': batch}
+                    yield _SSE_PREFIX + orjson.dumps(chunk) + _SSE_SUFFIX
+                    total += len(batch)
+
+                # Surface any upstream error raised by the producer
+                await asyncio.shield(future)
 
             # Send completion signal
-            yield f"data: {json.dumps({'status': 'completed', 'total': len(pools)})}\n\n"
+            yield _SSE_PREFIX + orjson.dumps({'status': 'completed', 'total': total}) + _SSE_SUFFIX
 
         except Exception as e:
             error_chunk = {
                 'status': 'error',
                 'error': str(e)
             }
-            yield f"data: {json.dumps(error_chunk)}\n\n"
+            yield _SSE_PREFIX + orjson.dumps(error_chunk) + _SSE_SUFFIX
 
     return StreamingResponse(
         generate_stream(),
@@ -474,7 +931,7 @@ async def get_pools_stream(
 async def get_analysis(request: AnalysisRequest):
     """Get analysis prompt for yield pools"""
     try:
-        analysis_prompt = analyze_yields(chain=request.chain, project=request.project)
+        analysis_prompt = analyze_yields_cached(request.chain, request.project)
         return {"prompt": analysis_prompt}
     except Exception as e:
         logger.error(f"Error generating analysis: {e}")
@@ -493,14 +950,10 @@ async def get_analysis_get(
 # Background task for periodic data refresh
 @app.post("/refresh")
 async def refresh_data(background_tasks: BackgroundTasks):
-    """Trigger background data refresh"""
+    """Trigger background data refresh (re-warms the pools cache)"""
     async def refresh_task():
         try:
-            class MockContext:
-                def info(self, message: str):
-                    logger.info(f"Background refresh: {message}")
-
-            await get_yield_pools_cached(ctx=MockContext())
+            await get_yield_pools_cached(ctx=_CTX, force_refresh=True, client=app.state.http)
             logger.info("Background data refresh completed")
         except Exception as e:
             logger.error(f"Background data refresh failed: {e}")
@@ -524,7 +977,7 @@ async def get_cache_stats():
             "total_keys": len(keys),
             "memory_usage": info.get("used_memory_human"),
             "connected_clients": info.get("connected_clients"),
-            "cache_keys": keys[:10]  # Show first 10 keys
+            "cache_keys": [key.decode() for key in keys[:10]]  # Show first 10 keys
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -540,17 +993,21 @@ async def clear_cache():
         keys = await redis.keys("defi_yields:*")
         if keys:
             await redis.delete(*keys)
+        _local_cache.clear()
         return {"status": "success", "cleared_keys": len(keys)}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 if __name__ == "__main__":
-    import os
-
     # Get configuration from environment variables
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
-    workers = int(os.getenv("WORKERS", "1"))
+    # Default to the 2n+1 workers-per-core heuristic; upstream calls are I/O bound
+    workers = int(os.getenv("WORKERS", str(2 * (os.cpu_count() or 1) + 1)))
+    # Cap in-flight connections per worker so overload gets fast 503s instead of a growing queue
+    limit_concurrency = int(os.getenv("LIMIT_CONCURRENCY", "200"))
+    keepalive = int(os.getenv("KEEPALIVE", "30"))
+    backlog = int(os.getenv("BACKLOG", "2048"))
 
     logger.info(f"Starting DeFi Yields HTTP Server on {host}:{port}")
 
@@ -561,5 +1018,10 @@ if __name__ == "__main__":
         port=port,
         workers=workers,
         reload=False,
+        loop="uvloop",
+        http="httptools",
+        backlog=backlog,
+        limit_concurrency=limit_concurrency,
+        timeout_keep_alive=keepalive,
         log_level="info"
     )
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .cli import get_yield_pools, analyze_yields
+from .cli import fetch_yield_pools, get_yield_pools, analyze_yields, to_yield_pool
 
-__all__ = ["get_yield_pools", "analyze_yields"]
\ No newline at end of file
+__all__ = ["fetch_yield_pools", "get_yield_pools", "analyze_yields", "to_yield_pool"]
\ No newline at end of file
@@ -1,11 +1,72 @@
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from mcp.server.fastmcp import FastMCP, Context
 import httpx
 
 # Initialize the MCP server
 mcp = FastMCP("DeFi Yields Server")
 
+def to_yield_pool(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the fields we expose from a raw yields.llama.fi pool record."""
+    return {
+        "chain": pool.get("chain", ""),
+        "pool": pool.get("symbol", ""),
+        "project": pool.get("project", ""),
+        "tvlUsd": pool.get("tvlUsd", 0.0),
+        "apy": pool.get("apy", 0.0),
+        "apyMean30d": pool.get("apyMean30d", 0.0),
+        "predictions": pool.get("predictions", {})
+    }
+
+async def fetch_yield_pools(
+    chain: str = None,
+    project: str = None,
+    ctx: Context = None,
+    client: Optional[httpx.AsyncClient] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetch and filter yield pools from the yields.llama.fi API.
+
+    Args:
+        chain: Optional filter for blockchain (e.g., 'Ethereum', 'Solana')
+        project: Optional filter for project name (e.g., 'lido', 'aave-v3')
+        ctx: Context used for progress and error logging
+        client: Optional shared httpx client; a one-shot client is used if omitted
+    """
+    if client is None:
+        async with httpx.AsyncClient() as client:
+            return await fetch_yield_pools(chain=chain, project=project, ctx=ctx, client=client)
+
+    try:
+        ctx.info("Fetching yield pools from yields.llama.fi")
+        response = await client.get("https://yields.llama.fi/pools")
+        response.raise_for_status()
+        data = response.json()
+        
+        if data.get("status") != "success":
+            raise ValueError("API returned non-success status")
+        
+        pools = data.get("data", [])
+        filtered_pools = []
+        
+        for pool in pools:
+            # Extract required fields
+            yield_pool = to_yield_pool(pool)
+            
+            # Apply filters
+            if chain and pool.get("chain", "").lower() != chain.lower():
+                continue
+            if project and yield_pool["project"].lower() != project.lower():
+                continue
+            
+            filtered_pools.append(yield_pool)
+        
+        ctx.info(f"Returning {len(filtered_pools)} yield pools")
+        return filtered_pools
+    except Exception as e:
+        ctx.error(f"Error fetching yield pools: {str(e)}")
+        raise
+
 # Tool to fetch and filter yield pools
 @mcp.tool()
 async def get_yield_pools(chain: str = None, project: str = None, ctx: Context = None) -> List[Dict[str, Any]]:
@@ -17,44 +78,7 @@ async def get_yield_pools(chain: str = None, project: str = None, ctx: Context =
         chain: Optional filter for blockchain (e.g., 'Ethereum', 'Solana')
         project: Optional filter for project name (e.g., 'lido', 'aave-v3')
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            ctx.info("Fetching yield pools from yields.llama.fi")
-            response = await client.get("https://yields.llama.fi/pools")
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") != "success":
-                raise ValueError("API returned non-success status")
-            
-            pools = data.get("data", [])
-            filtered_pools = []
-            
-            for pool in pools:
-                # Extract required fields
-                yield_pool = {
-                    "chain": pool.get("chain", ""),
-                    "pool": pool.get("symbol", ""),
-                    "project": pool.get("project", ""),
-                    "tvlUsd": pool.get("tvlUsd", 0.0),
-                    "apy": pool.get("apy", 0.0),
-                    "apyMean30d": pool.get("apyMean30d", 0.0),
-                    "predictions": pool.get("predictions", {})
-                }
-                
-                # Apply filters
-                if chain and pool.get("chain", "").lower() != chain.lower():
-                    continue
-                if project and yield_pool["project"].lower() != project.lower():
-                    continue
-                
-                filtered_pools.append(yield_pool)
-            
-            ctx.info(f"Returning {len(filtered_pools)} yield pools")
-            return filtered_pools
-        except Exception as e:
-            ctx.error(f"Error fetching yield pools: {str(e)}")
-            raise
+    return await fetch_yield_pools(chain=chain, project=project, ctx=ctx)
 
 # Prompt to guide users in analyzing yield pools
 @mcp.prompt()